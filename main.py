@@ -1,8 +1,24 @@
 import sys
 import os
+import gc
 import numpy as np
 import json
 import time
+import logging
+import weakref
+import tracemalloc
+import mmap
+import queue
+import struct
+import zipfile
+import posixpath
+import shutil
+import hashlib
+import tempfile
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from PIL import Image, ImageQt
 import qdarkstyle
@@ -14,67 +30,1518 @@ from PyQt5.QtWidgets import (
     QListWidget, QStackedWidget, QStatusBar, QProgressBar,
     QCheckBox, QDoubleSpinBox, QMessageBox, QTextBrowser
 )
-from PyQt5.QtCore import Qt, QTimer, QSize, pyqtSignal
+from PyQt5.QtCore import Qt, QTimer, QSize, QRect, QRectF, QObject, pyqtSignal
 from PyQt5.QtGui import QImage, QPixmap, QPalette, QColor, QPainter
+from PyQt5 import sip
 
 from live2d.model import Live2DModel
 
+logger = logging.getLogger("live2d_driver")
+
+class ModelBundle:
+    """模型压缩包 - 不解压直接索引和读取 .zip 中的模型文件
+    
+    ZipFile 只解析中央目录；以存储方式（未压缩）保存的成员在首次读取时建立内存映射，
+    直接返回映射上的 memoryview，不产生拷贝，压缩成员才解压读取。
+    缓存最多保留 MAX_OPEN 个打开的压缩包，超出时关闭最久未使用的。
+    live2d-py 只能从文件加载模型，加载时由 extract 将模型文件解压到按文件版本区分的缓存目录。
+    """
+    LOCAL_HEADER = struct.Struct('<4sHHHHHIIIHH')
+    MAX_OPEN = 8
+    EXTRACT_ROOT = os.path.join(tempfile.gettempdir(), "live2d_driver", "bundles")
+    _cache = OrderedDict()
+    
+    def __init__(self, path):
+        self.path = path
+        self.stamp = os.stat(path).st_mtime_ns
+        self.file = open(path, 'rb')
+        self.mmap = None
+        self.zip = zipfile.ZipFile(self.file)
+        self.index = {info.filename: info for info in self.zip.infolist() if not info.is_dir()}
+        
+        # 模型文件的相对路径均以 model3.json 所在目录为基准
+        self.settings_name = next(
+            (name for name in sorted(self.index) if name.endswith('.model3.json')), None
+        )
+        self.root = posixpath.dirname(self.settings_name) if self.settings_name else ""
+    
+    @classmethod
+    def get(cls, path):
+        """获取（并缓存）压缩包索引，文件变化后重新索引"""
+        key = os.path.abspath(path)
+        mtime = os.path.getmtime(key)
+        cached = cls._cache.get(key)
+        if cached and cached[0] == mtime:
+            cls._cache.move_to_end(key)
+            return cached[1]
+        if cached:
+            # 文件已变化：先关闭旧索引，避免句柄泄漏（Windows 上会阻止替换/删除文件）
+            cached[1].close()
+        bundle = cls(key)
+        cls._cache[key] = (mtime, bundle)
+        while len(cls._cache) > cls.MAX_OPEN:
+            cls._cache.popitem(last=False)[1][1].close()
+        return bundle
+    
+    @classmethod
+    def evict(cls, path):
+        """关闭并移出缓存中的压缩包"""
+        cached = cls._cache.get(os.path.abspath(path))
+        if cached:
+            cached[1].close()
+    
+    @classmethod
+    def openBundles(cls):
+        """当前缓存中打开的压缩包"""
+        return [bundle for _, bundle in cls._cache.values()]
+    
+    @staticmethod
+    def probe(path):
+        """只读取中央目录判断是否为模型压缩包，不缓存也不保持文件打开"""
+        with zipfile.ZipFile(path) as archive:
+            return any(name.endswith('.model3.json') for name in archive.namelist())
+    
+    @staticmethod
+    def isBundle(path):
+        """判断路径是否为模型压缩包"""
+        return bool(path) and path.lower().endswith('.zip') and os.path.isfile(path)
+    
+    def resolve(self, relpath):
+        """将模型内相对路径转换为压缩包成员名"""
+        return posixpath.normpath(posixpath.join(self.root, relpath.replace('\\', '/')))
+    
+    def read(self, relpath):
+        """读取模型文件：存储成员返回零拷贝 memoryview，压缩成员返回 bytes"""
+        info = self.index.get(self.resolve(relpath))
+        if info is None:
+            raise FileNotFoundError(f"{self.path} 中不存在 {relpath}")
+        if not self.isStored(relpath):
+            return self.zip.read(info)
+        
+        # 跳过本地文件头定位数据区
+        if self.mmap is None:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = self.LOCAL_HEADER.unpack_from(self.mmap, info.header_offset)
+        start = info.header_offset + self.LOCAL_HEADER.size + header[9] + header[10]
+        return memoryview(self.mmap)[start:start + info.file_size]
+    
+    def isStored(self, relpath):
+        """成员是否以存储方式（未压缩、未加密）保存，可零拷贝读取"""
+        info = self.index.get(self.resolve(relpath))
+        return bool(info) and info.compress_type == zipfile.ZIP_STORED and not info.flag_bits & 0x1
+    
+    def openStream(self, relpath):
+        """以流方式打开成员（只按需读取，例如仅解析图片头部）"""
+        return self.zip.open(self.resolve(relpath))
+    
+    def readJson(self, relpath):
+        """读取 JSON 文件"""
+        return json.loads(bytes(self.read(relpath)).decode('utf-8'))
+    
+    def settings(self):
+        """读取 model3.json 配置"""
+        if not self.settings_name:
+            return {}
+        return json.loads(self.zip.read(self.settings_name).decode('utf-8'))
+    
+    def extract(self):
+        """将模型文件解压到缓存目录并返回该目录（同一版本的压缩包只解压一次）"""
+        if not self.settings_name:
+            raise FileNotFoundError(f"{self.path} 中没有 model3.json")
+        bundle_dir = os.path.join(
+            self.EXTRACT_ROOT, hashlib.sha1(self.path.encode('utf-8')).hexdigest()[:16]
+        )
+        target = os.path.join(bundle_dir, str(self.stamp))
+        if os.path.isdir(target):
+            return target
+        
+        # 先解压到临时目录再改名，渲染进程同时加载时不会读到不完整的目录
+        os.makedirs(bundle_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=bundle_dir)
+        try:
+            for name in self.index:
+                relpath = posixpath.relpath(name, self.root) if self.root else name
+                if relpath.startswith('..') or posixpath.isabs(relpath):
+                    continue
+                dest = os.path.join(staging, *relpath.split('/'))
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, 'wb') as out:
+                    if self.isStored(relpath):
+                        out.write(self.read(relpath))
+                    else:
+                        with self.openStream(relpath) as src:
+                            shutil.copyfileobj(src, out)
+            os.replace(staging, target)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(target):
+                raise
+        
+        # 清理该压缩包旧版本的解压目录
+        for name in os.listdir(bundle_dir):
+            if name != str(self.stamp):
+                shutil.rmtree(os.path.join(bundle_dir, name), ignore_errors=True)
+        return target
+    
+    def mappedSize(self):
+        """内存映射的大小（尚未映射时为 0）"""
+        return 0 if self.mmap is None or self.mmap.closed else len(self.mmap)
+    
+    def close(self):
+        """关闭压缩包（仍有 memoryview 引用时映射由垃圾回收释放）"""
+        cached = self._cache.get(self.path)
+        if cached and cached[1] is self:
+            del self._cache[self.path]
+        self.zip.close()
+        if self.mmap is not None:
+            try:
+                self.mmap.close()
+            except BufferError:
+                pass
+        self.file.close()
+
+def readModelSettings(model_dir):
+    """读取模型目录或模型压缩包中的 model3.json 配置，返回配置字典（未找到时返回空字典）"""
+    if ModelBundle.isBundle(model_dir):
+        return ModelBundle.get(model_dir).settings()
+    if not model_dir or not os.path.isdir(model_dir):
+        return {}
+    for name in sorted(os.listdir(model_dir)):
+        if name.endswith('.model3.json'):
+            with open(os.path.join(model_dir, name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return {}
+
+def readModelJson(model_path, relpath):
+    """读取模型目录或模型压缩包中的 JSON 文件（路径相对于 model3.json）"""
+    if ModelBundle.isBundle(model_path):
+        return ModelBundle.get(model_path).readJson(relpath)
+    with open(os.path.join(model_path, relpath), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def loadLive2DModel(path):
+    """从模型目录或模型压缩包加载 Live2D 模型（压缩包先解压到缓存目录）"""
+    if ModelBundle.isBundle(path):
+        model = Live2DModel.from_dir(ModelBundle.get(path).extract())
+        # 模型路径仍指向压缩包，配置读取、重新加载和渲染进程都以压缩包为准
+        model.model_path = path
+        return model
+    return Live2DModel.from_dir(path)
+
+def readModelParameters(model, param_ids):
+    """读取模型当前（动作、物理更新之后）的参数值，模型不支持读取时返回 None"""
+    get_parameters = getattr(model, "get_parameters", None)
+    if get_parameters:
+        return np.asarray(get_parameters(), dtype=np.float32)
+    get_parameter = getattr(model, "get_parameter", None)
+    if get_parameter:
+        return np.fromiter((get_parameter(pid) for pid in param_ids),
+                           dtype=np.float32, count=len(param_ids))
+    return None
+
+def stopModelMotions(model):
+    """停止模型正在播放的所有动作"""
+    for target in (model.motion_manager, model):
+        stop = getattr(target, "stop_all_motions", None)
+        if stop:
+            stop()
+            return
+
+def estimateModelMemory(path):
+    """估算模型内存：返回 (moc 字节数, {材质路径: 解码后字节数})，只读取图片头部"""
+    refs = readModelSettings(path).get("FileReferences", {})
+    bundle = ModelBundle.get(path) if ModelBundle.isBundle(path) else None
+    
+    moc_size = 0
+    if refs.get("Moc"):
+        if bundle:
+            info = bundle.index.get(bundle.resolve(refs["Moc"]))
+            moc_size = info.file_size if info else 0
+        elif os.path.isfile(os.path.join(path, refs["Moc"])):
+            moc_size = os.path.getsize(os.path.join(path, refs["Moc"]))
+    
+    textures = {}
+    for texture in refs.get("Textures", []):
+        try:
+            size = None
+            if bundle and bundle.isStored(texture):
+                # 未压缩的 PNG 直接在内存映射上读取尺寸，不拷贝数据
+                size = pngSize(bundle.read(texture))
+            if size is None:
+                source = bundle.openStream(texture) if bundle else os.path.join(path, texture)
+                with Image.open(source) as im:
+                    size = im.size
+            textures[texture] = size[0] * size[1] * 4
+        except (OSError, KeyError):
+            continue
+    return moc_size, textures
+
+def pngSize(data):
+    """从 PNG 数据的 IHDR 头部读取 (宽, 高)，不是 PNG 时返回 None"""
+    if len(data) < 24 or bytes(data[:8]) != b'\x89PNG\r\n\x1a\n':
+        return None
+    return struct.unpack_from('>II', data, 16)
+
+class ExpressionManager:
+    """表情与姿势混合引擎 - 基于参数数组的向量化计算
+    
+    exp3.json 中的每个表情被编译为与参数数组等长的稠密向量（加算、乘算、覆盖值与覆盖掩码），
+    多个表情按权重叠加并交叉淡入淡出；pose3.json 的部件分组同样以数组运算求出不透明度。
+    混合在模型更新（动作、物理）之后进行，以本帧的动画参数值为基础，结果每帧重新写入。
+    """
+    BLEND_ADD = "Add"
+    BLEND_MULTIPLY = "Multiply"
+    BLEND_OVERWRITE = "Overwrite"
+    
+    # Cubism 姿势切换常量
+    POSE_PHI = 0.5
+    POSE_BACK_OPACITY_THRESHOLD = 0.15
+    
+    def __init__(self, param_ids=None, part_ids=None):
+        self.expressions = {}
+        self.active = []
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.targets = np.zeros(0, dtype=np.float32)
+        self.fade_rates = np.zeros(0, dtype=np.float32)
+        self.pose = None
+        self.setModelIds(param_ids or [], part_ids or [])
+    
+    def setModelIds(self, param_ids, part_ids):
+        """设置模型的参数与部件ID，并重置所有数组"""
+        self.param_ids = list(param_ids)
+        self.part_ids = list(part_ids)
+        self.param_index = {pid: i for i, pid in enumerate(self.param_ids)}
+        self.part_index = {pid: i for i, pid in enumerate(self.part_ids)}
+        
+        # 滑块设置的基础值（overridden 标记被滑块覆盖、不再由动作驱动的参数）与本帧输出
+        self.base_values = np.full(len(self.param_ids), 0.5, dtype=np.float32)
+        self.overridden = np.zeros(len(self.param_ids), dtype=bool)
+        self.output_values = self.base_values.copy()
+        # 受激活表情影响的参数，以及上一帧写入模型的参数
+        self.touched = np.zeros(len(self.param_ids), dtype=bool)
+        self.pushed = np.zeros(len(self.param_ids), dtype=bool)
+        self.part_opacities = np.ones(len(self.part_ids), dtype=np.float32)
+        
+        self.expressions.clear()
+        self.active = []
+        self.weights = np.zeros(0, dtype=np.float32)
+        self.targets = np.zeros(0, dtype=np.float32)
+        self.fade_rates = np.zeros(0, dtype=np.float32)
+        self._stack = None
+        self.pose = None
+    
+    def setBaseValue(self, param, value):
+        """记录参数基础值（表情在此基础上混合），参数不存在时返回 False"""
+        index = self.param_index.get(param)
+        if index is None:
+            return False
+        self.base_values[index] = value
+        self.overridden[index] = True
+        return True
+    
+    def releaseBaseValues(self, value=0.5):
+        """重置基础值并取消滑块覆盖，参数交还给动作和物理驱动"""
+        self.base_values[:] = value
+        self.overridden[:] = False
+    
+    def loadFromSettings(self, settings, model_dir):
+        """根据 model3.json 的 FileReferences 加载表情和姿势（可选资源，单项失败只记录警告）"""
+        refs = settings.get("FileReferences", {})
+        for entry in refs.get("Expressions", []):
+            try:
+                self.addExpression(entry["Name"], readModelJson(model_dir, entry["File"]))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("跳过无法加载的表情 %r: %s", entry, e)
+        
+        if refs.get("Pose"):
+            try:
+                self.setPose(readModelJson(model_dir, refs["Pose"]))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("跳过无法加载的姿势 %s: %s", refs["Pose"], e)
+    
+    def addExpression(self, name, data):
+        """将 exp3.json 内容编译为稠密混合向量"""
+        count = len(self.param_ids)
+        add = np.zeros(count, dtype=np.float32)
+        mul = np.ones(count, dtype=np.float32)
+        overwrite = np.zeros(count, dtype=np.float32)
+        mask = np.zeros(count, dtype=np.float32)
+        
+        for entry in data.get("Parameters", []):
+            index = self.param_index.get(entry.get("Id"))
+            if index is None:
+                continue
+            value = float(entry.get("Value", 0.0))
+            blend = entry.get("Blend", self.BLEND_ADD)
+            if blend == self.BLEND_MULTIPLY:
+                mul[index] = value
+            elif blend == self.BLEND_OVERWRITE:
+                overwrite[index] = value
+                mask[index] = 1.0
+            else:
+                add[index] = value
+        
+        self.expressions[name] = {
+            "add": add,
+            "mul": mul,
+            "overwrite": overwrite,
+            "mask": mask,
+            "fade_in": float(data.get("FadeInTime", 1.0)),
+            "fade_out": float(data.get("FadeOutTime", 1.0)),
+        }
+    
+    def expressionNames(self):
+        """获取已加载的表情名称"""
+        return list(self.expressions.keys())
+    
+    def setExpression(self, name, stack=False):
+        """激活表情；stack 为 False 时其他表情交叉淡出"""
+        if name not in self.expressions:
+            raise KeyError(f"未知表情: {name}")
+        if not stack:
+            self.targets[:] = 0.0
+            self.fade_rates = np.array(
+                [self._fadeRate(self.expressions[n]["fade_out"]) for n in self.active],
+                dtype=np.float32
+            )
+        
+        if name in self.active:
+            index = self.active.index(name)
+            self.targets[index] = 1.0
+            self.fade_rates[index] = self._fadeRate(self.expressions[name]["fade_in"])
+            return
+        
+        self.active.append(name)
+        self.weights = np.append(self.weights, np.float32(0.0))
+        self.targets = np.append(self.targets, np.float32(1.0))
+        self.fade_rates = np.append(
+            self.fade_rates, np.float32(self._fadeRate(self.expressions[name]["fade_in"]))
+        )
+        self._stack = None
+    
+    def clearExpressions(self):
+        """淡出所有激活的表情"""
+        self.targets[:] = 0.0
+        self.fade_rates = np.array(
+            [self._fadeRate(self.expressions[n]["fade_out"]) for n in self.active],
+            dtype=np.float32
+        )
+    
+    def _fadeRate(self, fade_time):
+        """淡入淡出速率（每秒权重变化量），淡变时间为0时立即生效"""
+        return np.inf if fade_time <= 0 else 1.0 / fade_time
+    
+    def _buildStack(self):
+        """将激活表情的向量堆叠为 (k, N) 矩阵"""
+        exprs = [self.expressions[name] for name in self.active]
+        self._stack = {
+            key: np.stack([e[key] for e in exprs]) for key in ("add", "mul", "overwrite", "mask")
+        }
+        stack = self._stack
+        self.touched = ((stack["add"] != 0.0) | (stack["mul"] != 1.0) | (stack["mask"] > 0.0)).any(axis=0)
+    
+    def setPose(self, data):
+        """将 pose3.json 的部件分组编译为索引数组"""
+        members, groups, starts = [], [], []
+        link_targets, link_sources = [], []
+        for group in data.get("Groups", []):
+            valid = [entry for entry in group if entry.get("Id") in self.part_index]
+            if not valid:
+                continue
+            starts.append(len(members))
+            for entry in valid:
+                part = self.part_index[entry["Id"]]
+                members.append(part)
+                groups.append(len(starts) - 1)
+                for link in entry.get("Link", []):
+                    if link in self.part_index:
+                        link_targets.append(self.part_index[link])
+                        link_sources.append(part)
+        
+        if not members:
+            self.pose = None
+            return
+        
+        # 部件对应的可见性参数（与部件同名的参数），不存在时为 -1
+        param_of_member = np.array(
+            [self.param_index.get(self.part_ids[p], -1) for p in members], dtype=np.int64
+        )
+        self.pose = {
+            "members": np.array(members, dtype=np.int64),
+            "groups": np.array(groups, dtype=np.int64),
+            "starts": np.array(starts, dtype=np.int64),
+            "params": param_of_member,
+            "link_targets": np.array(link_targets, dtype=np.int64),
+            "link_sources": np.array(link_sources, dtype=np.int64),
+            "fade_in": float(data.get("FadeInTime", 0.5)),
+        }
+        # 每帧写入的部件（分组成员及其链接部件）
+        self.pose["parts"] = np.unique(np.concatenate([self.pose["members"], self.pose["link_targets"]]))
+        
+        # 初始化：每组仅第一个部件可见
+        opacities = np.zeros(len(members), dtype=np.float32)
+        opacities[self.pose["starts"]] = 1.0
+        self.part_opacities[self.pose["members"]] = opacities
+        self._applyLinks()
+    
+    def _applyLinks(self):
+        """链接部件跟随源部件的不透明度"""
+        if self.pose is not None and len(self.pose["link_targets"]):
+            self.part_opacities[self.pose["link_targets"]] = \
+                self.part_opacities[self.pose["link_sources"]]
+    
+    def _updatePose(self, dt):
+        """按 Cubism 规则向量化更新各分组的部件不透明度"""
+        pose = self.pose
+        members = pose["members"]
+        positions = np.arange(len(members))
+        
+        # 每组选出第一个可见性参数大于阈值的部件，否则选组内第一个部件
+        params = pose["params"]
+        flags = np.zeros(len(members), dtype=bool)
+        has_param = params >= 0
+        flags[has_param] = self.output_values[params[has_param]] > 0.001
+        candidates = np.where(flags, positions, len(members))
+        visible = np.minimum.reduceat(candidates, pose["starts"])
+        visible = np.where(visible < len(members), visible, pose["starts"])
+        
+        # 可见部件淡入
+        opacities = self.part_opacities[members]
+        step = 1.0 if pose["fade_in"] <= 0 else dt / pose["fade_in"]
+        new_visible = np.minimum(opacities[visible] + step, 1.0)
+        
+        # 其余部件按可见部件不透明度计算上限
+        phi = self.POSE_PHI
+        threshold = self.POSE_BACK_OPACITY_THRESHOLD
+        limit = np.where(
+            new_visible < phi,
+            new_visible * (phi - 1.0) / phi + 1.0,
+            (1.0 - new_visible) * phi / (1.0 - phi)
+        )
+        back = (1.0 - limit) * (1.0 - new_visible)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            clamped = 1.0 - threshold / (1.0 - new_visible)
+        limit = np.where((back > threshold) & (new_visible < 1.0), clamped, limit)
+        
+        group_of_member = pose["groups"]
+        result = np.minimum(opacities, limit[group_of_member])
+        result[visible] = new_visible
+        self.part_opacities[members] = result
+        self._applyLinks()
+    
+    def update(self, dt, animated=None):
+        """推进淡变并计算本帧的参数输出数组和部件不透明度
+        
+        animated 为模型更新后的参数值，作为未被滑块覆盖的参数的混合基础；无法读取时使用滑块基础值。
+        """
+        if animated is None:
+            base = self.base_values
+        else:
+            base = np.where(self.overridden, self.base_values, animated).astype(np.float32, copy=False)
+
+        if self.active:
+            # 权重向目标值推进；淡变时间为 0（速率无穷大）时直接到达目标，dt<=0 时其余表情保持不变
+            step = self.fade_rates * dt if dt > 0 else np.zeros_like(self.fade_rates)
+            step[np.isinf(self.fade_rates)] = np.inf
+            delta = np.clip(self.targets - self.weights, -step, step)
+            self.weights = self.weights + delta
+            
+            # 移除已完全淡出的表情
+            keep = (self.weights > 0.0) | (self.targets > 0.0)
+            if not keep.all():
+                self.active = [name for name, k in zip(self.active, keep) if k]
+                self.weights = self.weights[keep]
+                self.targets = self.targets[keep]
+                self.fade_rates = self.fade_rates[keep]
+                self._stack = None
+        
+        if self.active:
+            if self._stack is None:
+                self._buildStack()
+            w = self.weights[:, None]
+            stack = self._stack
+            values = (base + (w * stack["add"]).sum(axis=0)) \
+                * np.prod(1.0 + w * (stack["mul"] - 1.0), axis=0)
+            # 覆盖混合按激活顺序依次插值（循环次数为表情数量而非参数数量）
+            for weight, overwrite, mask in zip(self.weights, stack["overwrite"], stack["mask"]):
+                values += weight * mask * (overwrite - values)
+            self.output_values = values.astype(np.float32, copy=False)
+        else:
+            self.touched = np.zeros(len(self.param_ids), dtype=bool)
+            self.output_values = base.copy()
+        
+        if self.pose is not None:
+            self._updatePose(dt)
+        return self.output_values
+    
+    def apply(self, model, indices=None):
+        """将输出写入模型（在模型更新之后调用）
+        
+        被滑块覆盖或受表情影响的参数每帧重新写入，否则会被下一次更新中的动作覆盖；
+        indices 指定时只写入这些参数（回放）。不再写入的参数通过 release_parameters
+        通知目标（渲染进程代理据此停止覆盖），交还给动作驱动。
+        """
+        if indices is None:
+            mask = self.overridden | self.touched
+        else:
+            mask = np.zeros(len(self.param_ids), dtype=bool)
+            mask[indices] = True
+        for index in np.flatnonzero(mask):
+            model.set_parameter(self.param_ids[index], float(self.output_values[index]))
+        
+        release = getattr(model, "release_parameters", None)
+        released = np.flatnonzero(self.pushed & ~mask)
+        if release and len(released):
+            release([self.param_ids[index] for index in released])
+        self.pushed = mask
+        
+        set_part_opacity = getattr(model, "set_part_opacity", None)
+        if set_part_opacity and self.pose is not None:
+            for index in self.pose["parts"]:
+                set_part_opacity(self.part_ids[index], float(self.part_opacities[index]))
+
+class ParameterRecorder:
+    """参数时间线录制器 - 分块列式存储，可边录制边追加写入
+    
+    文件结构：魔数 + 头部JSON（参数ID列表、块大小），随后为定长数据块。
+    每块包含帧数、CHUNK_FRAMES 个时间戳以及按参数列存储的数值矩阵 (N, CHUNK_FRAMES)，
+    未写满的最后一块在每次 flush 时原位覆盖（录制中至少每 FLUSH_INTERVAL 秒一次），
+    因此文件在任意 flush 之后都可读取。
+    """
+    MAGIC = b"L2DREC1\0"
+    CHUNK_FRAMES = 256
+    # 未写满的块至少按此间隔（秒）写入文件，限制崩溃时丢失的帧并让读取方及时看到新帧
+    FLUSH_INTERVAL = 1.0
+    
+    def __init__(self, path, param_ids, chunk_frames=None):
+        self.path = path
+        self.param_ids = list(param_ids)
+        self.chunk_frames = chunk_frames or self.CHUNK_FRAMES
+        self.dtype = ParameterRecorder.chunkDtype(len(self.param_ids), self.chunk_frames)
+        self.chunk = np.zeros((), dtype=self.dtype)
+        self.chunk_index = 0
+        self.frame_count = 0
+        self.start_time = None
+        self.last_flush = time.monotonic()
+        
+        self.file = open(path, 'wb')
+        header = json.dumps({
+            "parameters": self.param_ids,
+            "chunk_frames": self.chunk_frames,
+        }).encode('utf-8')
+        header += b" " * (-len(header) % 8)
+        self.file.write(self.MAGIC)
+        self.file.write(np.array([len(header), 0], dtype='<u4').tobytes())
+        self.file.write(header)
+        self.data_offset = self.file.tell()
+        # 头部立即写入文件，录制开始后即可用 ParameterTimeline 打开（此时还没有帧）
+        self.file.flush()
+    
+    @staticmethod
+    def chunkDtype(param_count, chunk_frames):
+        """数据块的结构化类型（读写双方共用）"""
+        return np.dtype([
+            ('count', '<u8'),
+            ('time', '<f8', (chunk_frames,)),
+            ('values', '<f4', (param_count, chunk_frames)),
+        ])
+    
+    def record(self, values, timestamp=None):
+        """追加一帧完整参数向量；未指定时间戳时使用距录制开始的秒数"""
+        if timestamp is None:
+            now = time.perf_counter()
+            if self.start_time is None:
+                self.start_time = now
+            timestamp = now - self.start_time
+        
+        column = int(self.chunk['count'])
+        self.chunk['time'][column] = timestamp
+        self.chunk['values'][:, column] = values
+        self.chunk['count'] = column + 1
+        self.frame_count += 1
+        
+        if column + 1 == self.chunk_frames:
+            self.flush()
+            self.chunk_index += 1
+            self.chunk = np.zeros((), dtype=self.dtype)
+        elif time.monotonic() - self.last_flush >= self.FLUSH_INTERVAL:
+            self.flush()
+    
+    def flush(self):
+        """将当前块写入其在文件中的固定位置"""
+        if int(self.chunk['count']) == 0:
+            return
+        self.file.seek(self.data_offset + self.chunk_index * self.dtype.itemsize)
+        self.file.write(self.chunk.tobytes())
+        self.file.flush()
+        self.last_flush = time.monotonic()
+    
+    def close(self):
+        """写入剩余帧并关闭文件"""
+        if self.file:
+            self.flush()
+            self.file.close()
+            self.file = None
+
+class ParameterTimeline:
+    """参数时间线回放 - 内存映射读取，按时间索引确定性采样"""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(ParameterRecorder.MAGIC)) != ParameterRecorder.MAGIC:
+                raise ValueError(f"不是有效的参数录制文件: {path}")
+            header_length = int(np.frombuffer(f.read(8), dtype='<u4')[0])
+            header = json.loads(f.read(header_length).decode('utf-8'))
+            data_offset = f.tell()
+            file_size = os.fstat(f.fileno()).st_size
+        
+        self.param_ids = header["parameters"]
+        self.chunk_frames = header["chunk_frames"]
+        dtype = ParameterRecorder.chunkDtype(len(self.param_ids), self.chunk_frames)
+        
+        # 只映射完整写入的块，忽略中断录制时残留的不完整数据
+        chunk_count = (file_size - data_offset) // dtype.itemsize
+        if chunk_count:
+            self.chunks = np.memmap(path, dtype=dtype, mode='r',
+                                    offset=data_offset, shape=(chunk_count,))
+            counts = self.chunks['count'].astype(np.int64)
+            valid = np.arange(self.chunk_frames) < counts[:, None]
+            # 时间索引：所有有效帧的时间戳（数值列仍保留在映射中）
+            self.times = self.chunks['time'][valid]
+            self.frame_chunk, self.frame_column = np.nonzero(valid)
+        else:
+            self.chunks = None
+            self.times = np.zeros(0, dtype=np.float64)
+            self.frame_chunk = self.frame_column = np.zeros(0, dtype=np.int64)
+    
+    def __len__(self):
+        return len(self.times)
+    
+    @property
+    def duration(self):
+        """时间线总时长（秒）"""
+        return float(self.times[-1] - self.times[0]) if len(self.times) else 0.0
+    
+    def frame(self, index):
+        """获取第 index 帧的参数向量（从映射中按列取出）"""
+        return self.chunks['values'][self.frame_chunk[index], :, self.frame_column[index]]
+    
+    def seek(self, t):
+        """按时间查找不晚于 t 的帧序号"""
+        index = np.searchsorted(self.times, self.times[0] + t, side='right') - 1
+        return int(np.clip(index, 0, len(self.times) - 1))
+    
+    def sample(self, t):
+        """在相对时间 t 处对参数做线性插值，结果只取决于 t"""
+        if not len(self.times):
+            raise ValueError("录制文件中没有帧")
+        index = self.seek(t)
+        current = np.asarray(self.frame(index), dtype=np.float32)
+        if index + 1 >= len(self.times):
+            return current
+        t0, t1 = self.times[index], self.times[index + 1]
+        ratio = np.clip((self.times[0] + t - t0) / (t1 - t0), 0.0, 1.0) if t1 > t0 else 0.0
+        return current + np.float32(ratio) * (np.asarray(self.frame(index + 1)) - current)
+    
+    def frames(self, fps):
+        """以固定帧率逐帧生成 (时间, 参数向量)，用于离线渲染和基准测试"""
+        for n in range(int(self.duration * fps) + 1):
+            t = n / fps
+            yield t, self.sample(t)
+    
+    def mapTo(self, param_ids):
+        """生成从录制列到目标参数顺序的索引映射 (目标索引, 录制索引)"""
+        source = {pid: i for i, pid in enumerate(self.param_ids)}
+        pairs = [(i, source[pid]) for i, pid in enumerate(param_ids) if pid in source]
+        if not pairs:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        target, columns = zip(*pairs)
+        return np.array(target, dtype=np.int64), np.array(columns, dtype=np.int64)
+    
+    def close(self):
+        """释放内存映射"""
+        self.chunks = None
+
+class HitAreaTester:
+    """点击区域检测 - 按 model3.json 中 HitAreas 的顺序调用 live2d-py 的 LAppModel.HitTest
+    
+    live2d-py 不公开可绘制对象的网格数据，点击区域只能由 HitTest(区域名称, x, y) 判断
+    （坐标为模型画布像素坐标）。每个模型通常只有几个点击区域，逐个检测即可。
+    """
+    
+    def __init__(self, hit_areas):
+        self.names = [area.get("Name", area["Id"]) for area in hit_areas if area.get("Id")]
+    
+    def hitTest(self, model, x, y):
+        """返回点 (x, y) 命中的点击区域名称；模型不支持 HitTest 时不报告命中"""
+        hit = getattr(model, "HitTest", None)
+        if hit is None:
+            return []
+        return [name for name in self.names if hit(name, x, y)]
+
+class SceneEntry:
+    """场景中的单个模型及其变换和层级"""
+    
+    def __init__(self, model, z_order=0):
+        self.z_order = z_order
+        self.scale = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        # 模型更新之后、渲染之前调用（例如写入表情混合结果），参数为模型
+        self.after_update = None
+        self.setModel(model)
+    
+    def setModel(self, model):
+        """更换模型并读取其点击区域和动作分组"""
+        self.model = model
+        self.image = None
+        settings = readModelSettings(model.model_path)
+        self.hit_areas = HitAreaTester(settings.get("HitAreas", []))
+        self.motion_groups = list(settings.get("FileReferences", {}).get("Motions", {}).keys())
+    
+    @property
+    def name(self):
+        return os.path.basename(self.model.model_path)
+
+class Live2DScene:
+    """多模型场景 - 更新各模型后按层级合成为一帧
+    
+    线程池只有在模型更新释放 GIL 时才有收益，而随附的 live2d-py（v3 原生扩展与纯 Python 的 v2）
+    在更新时并不释放 GIL。因此模型数量变化后先交替实测串行与线程池的耗时，
+    只有线程池明显更快时才使用它，否则串行更新。
+    """
+    # 每种方式的测量帧数
+    CALIBRATION_FRAMES = 8
+    # 线程池耗时需低于串行耗时的该比例才启用
+    PARALLEL_GAIN = 0.85
+    
+    def __init__(self, max_workers=None):
+        self.entries = []
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.executor = None
+        self.frame_buffer = None
+        self.frame_array = None
+        self.content_box = None
+        
+        # 串行 / 线程池的实测结果（None 表示尚未决定）
+        self.use_pool = None
+        self.timings = {"serial": [], "pool": []}
+        self.calibrated_count = 0
+    
+    def addModel(self, model, z_order=None):
+        """添加模型到场景，默认置于最上层"""
+        if z_order is None:
+            z_order = max((e.z_order for e in self.entries), default=-1) + 1
+        entry = SceneEntry(model, z_order)
+        self.entries.append(entry)
+        return entry
+    
+    def removeEntry(self, entry):
+        """从场景移除模型（不负责销毁模型）"""
+        if entry in self.entries:
+            self.entries.remove(entry)
+    
+    def bringToFront(self, entry):
+        """将模型置于最上层"""
+        entry.z_order = max(e.z_order for e in self.entries) + 1
+    
+    def sortedEntries(self):
+        """按层级从下到上排序的模型列表"""
+        return sorted(self.entries, key=lambda e: e.z_order)
+    
+    def update(self, entries=None):
+        """更新模型（默认全部）并生成各自的图像（实测更快时使用线程池）"""
+        entries = self.entries if entries is None else entries
+        if len(entries) <= 1:
+            for entry in entries:
+                self.updateEntry(entry)
+            return
+        
+        if len(entries) != self.calibrated_count:
+            # 模型数量变化后重新测量
+            self.use_pool = None
+            self.timings = {"serial": [], "pool": []}
+            self.calibrated_count = len(entries)
+        
+        if self.use_pool is None:
+            serial, pool = self.timings["serial"], self.timings["pool"]
+            mode = "serial" if len(serial) <= len(pool) else "pool"
+            start = time.perf_counter()
+            self.updateEntries(entries, mode == "pool")
+            self.timings[mode].append(time.perf_counter() - start)
+            
+            if len(serial) >= self.CALIBRATION_FRAMES and len(pool) >= self.CALIBRATION_FRAMES:
+                self.use_pool = np.median(pool) < np.median(serial) * self.PARALLEL_GAIN
+                logger.info("场景更新方式: %s（串行 %.2f ms，线程池 %.2f ms）",
+                            "线程池" if self.use_pool else "串行",
+                            np.median(serial) * 1000, np.median(pool) * 1000)
+                if not self.use_pool:
+                    self.shutdown()
+            return
+        
+        self.updateEntries(entries, self.use_pool)
+    
+    def updateEntries(self, entries, use_pool):
+        """串行或在线程池中更新指定模型"""
+        if not use_pool:
+            for entry in entries:
+                self.updateEntry(entry)
+            return
+        
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="live2d-scene"
+            )
+        # list() 等待全部完成并将工作线程中的异常抛回主线程
+        list(self.executor.map(self.updateEntry, entries))
+    
+    def updateEntry(self, entry):
+        """更新单个模型（在工作线程中执行）"""
+        entry.model.update()
+        if entry.after_update:
+            entry.after_update(entry.model)
+        entry.image = self.renderEntry(entry)
+    
+    def renderEntry(self, entry):
+        """渲染单个模型图像（复用上一帧的图像缓冲）"""
+        img = entry.image
+        if img is None or img.size != (300, 400):
+            img = Image.new('RGBA', (300, 400))
+        
+        # 模型渲染占位符
+        img.paste((255, 150, 150, 200), (0, 0, 300, 400))
+        return img
+    
+    def compose(self, width, height, background=None, exclude=None):
+        """按层级将模型图像合成到透明帧（复用帧缓冲）
+        
+        background 为同尺寸的底图（例如渲染进程输出的帧），exclude 为已包含在底图中的模型。
+        合成后 content_box 为帧中有内容的区域 (left, top, right, bottom)，没有内容时为 None。
+        """
+        img = self.frame_buffer
+        if img is None or img.size != (width, height):
+            # 图像直接映射在 frame_array 上，合成结果可零拷贝交给 QImage 或共享内存
+            self.frame_array = np.zeros((height, width, 4), dtype=np.uint8)
+            img = self.frame_buffer = Image.frombuffer(
+                'RGBA', (width, height), self.frame_array, 'raw', 'RGBA', 0, 1
+            )
+            # frombuffer 默认只读，写入时会复制；置为可写以便直接绘制到映射内存
+            img.readonly = 0
+        if background is not None:
+            img.paste(background, (0, 0))
+            self.content_box = background.getbbox()
+        else:
+            img.paste((0, 0, 0, 0), (0, 0, width, height))
+            self.content_box = None
+        for entry in self.sortedEntries():
+            if entry is exclude:
+                continue
+            model_img = entry.image or self.renderEntry(entry)
+            if entry.scale != 1.0:
+                size = (max(1, round(model_img.width * entry.scale)),
+                        max(1, round(model_img.height * entry.scale)))
+                model_img = model_img.resize(size, Image.BILINEAR)
+            
+            # 以场景中心为原点放置模型，裁掉超出帧的部分
+            x = round((width - model_img.width) / 2 + entry.offset_x)
+            y = round((height - model_img.height) / 2 + entry.offset_y)
+            box = (max(x, 0), max(y, 0),
+                   min(x + model_img.width, width), min(y + model_img.height, height))
+            if box[0] >= box[2] or box[1] >= box[3]:
+                continue
+            img.alpha_composite(model_img, box[:2], (box[0] - x, box[1] - y, box[2] - x, box[3] - y))
+            if self.content_box is None:
+                self.content_box = box
+            else:
+                self.content_box = (min(self.content_box[0], box[0]), min(self.content_box[1], box[1]),
+                                    max(self.content_box[2], box[2]), max(self.content_box[3], box[3]))
+        return img
+    
+    def shutdown(self):
+        """关闭线程池"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+class SharedFrameBuffer:
+    """共享内存帧缓冲 - 三缓冲 + 每槽序列锁，写入方与读取方互不阻塞
+    
+    头部为 int64 数组：[最新槽位, 帧计数, 各槽序列号...]，序列号为奇数表示该槽正在写入。
+    """
+    SLOTS = 3
+    HEADER_SIZE = 64
+    
+    def __init__(self, width, height, name=None):
+        self.width = width
+        self.height = height
+        frame_size = width * height * 4
+        if name is None:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=self.HEADER_SIZE + frame_size * self.SLOTS
+            )
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        
+        self.header = np.ndarray((self.HEADER_SIZE // 8,), dtype=np.int64, buffer=self.shm.buf)
+        self.frames = np.ndarray(
+            (self.SLOTS, height, width, 4), dtype=np.uint8,
+            buffer=self.shm.buf, offset=self.HEADER_SIZE
+        )
+        if self.owner:
+            self.header[:] = 0
+            self.header[0] = -1
+        self.next_slot = 0
+    
+    @property
+    def name(self):
+        return self.shm.name
+    
+    def write(self, frame):
+        """写入一帧到下一个槽位并发布（写入方调用）"""
+        slot = self.next_slot
+        if slot == self.header[0]:
+            slot = (slot + 1) % self.SLOTS
+        self.header[2 + slot] += 1
+        self.frames[slot] = frame
+        self.header[2 + slot] += 1
+        self.header[0] = slot
+        self.header[1] += 1
+        self.next_slot = (slot + 1) % self.SLOTS
+    
+    def read(self, last_counter=-1, out=None):
+        """读取最新完成的帧副本（可写入 out 复用内存），无新帧或读取期间被覆盖时返回 None
+        
+        读取被覆盖时 out 中是不完整的数据，调用方不能把正在显示的帧作为 out。
+        """
+        counter = int(self.header[1])
+        slot = int(self.header[0])
+        if slot < 0 or counter == last_counter:
+            return None
+        
+        seq = int(self.header[2 + slot])
+        if seq % 2:
+            return None
+        if out is None:
+            out = np.empty_like(self.frames[slot])
+        np.copyto(out, self.frames[slot])
+        frame = out
+        if int(self.header[2 + slot]) != seq:
+            return None
+        return counter, frame
+    
+    def close(self):
+        """释放共享内存（创建方同时删除）"""
+        self.header = None
+        self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def renderWorkerMain(model_path, shm_name, width, height, commands, fps):
+    """渲染进程入口：更新并渲染模型，把完成的帧写入共享内存"""
+    frames = SharedFrameBuffer(width, height, name=shm_name)
+    scene = Live2DScene(max_workers=1)
+    model = loadLive2DModel(model_path)
+    entry = scene.addModel(model)
+    interval = 1.0 / fps
+    
+    # 界面端写入的参数和部件不透明度在每次模型更新之后重新应用，不被动作覆盖
+    parameters, part_opacities = {}, {}
+    def applyOverrides(model):
+        for param, value in parameters.items():
+            model.set_parameter(param, value)
+        set_part_opacity = getattr(model, "set_part_opacity", None)
+        if set_part_opacity:
+            for part, opacity in part_opacities.items():
+                set_part_opacity(part, opacity)
+    entry.after_update = applyOverrides
+    
+    try:
+        running = True
+        next_frame = time.perf_counter()
+        while running:
+            # 处理界面进程发来的命令
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                name, args = command[0], command[1:]
+                if name == "stop":
+                    running = False
+                elif name == "set_parameter":
+                    parameters[args[0]] = args[1]
+                elif name == "release_parameters":
+                    for param in args[0]:
+                        parameters.pop(param, None)
+                elif name == "set_part_opacity":
+                    part_opacities[args[0]] = args[1]
+                elif name == "start_motion":
+                    if model.motion_manager:
+                        model.motion_manager.start_motion(*args)
+                elif name == "stop_all_motions":
+                    stopModelMotions(model)
+                elif name == "set_transform":
+                    entry.offset_x, entry.offset_y, entry.scale = args
+            if not running:
+                break
+            
+            scene.update()
+            scene.compose(width, height)
+            frames.write(scene.frame_array)
+            
+            next_frame += interval
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_frame = time.perf_counter()
+    finally:
+        model.destroy()
+        frames.close()
+
+class RenderWorkerClient:
+    """独立渲染进程的界面端代理
+    
+    提供与模型相同的 set_parameter、set_part_opacity 和 motion_manager.start_motion 接口，
+    调用被转换为命令发往渲染进程；写入的参数在渲染进程中持续覆盖动作，直到 release_parameters。
+    界面只需读取共享内存中最新完成的帧。
+    """
+    
+    def __init__(self, model_path, width, height, fps=30):
+        self.model_path = model_path
+        self.frames = SharedFrameBuffer(width, height)
+        # 双缓冲：读入后台缓冲，校验通过后才与正在显示的前台缓冲交换
+        self.frame_front = np.empty((height, width, 4), dtype=np.uint8)
+        self.frame_back = np.empty_like(self.frame_front)
+        self.last_counter = -1
+        
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.process = context.Process(
+            target=renderWorkerMain,
+            args=(model_path, self.frames.name, width, height, self.commands, fps),
+            daemon=True
+        )
+        self.process.start()
+        self.motion_manager = self
+        self.transform = (0.0, 0.0, 1.0)
+    
+    def set_parameter(self, param, value):
+        self.commands.put(("set_parameter", param, value))
+    
+    def release_parameters(self, params):
+        self.commands.put(("release_parameters", list(params)))
+    
+    def set_part_opacity(self, part, opacity):
+        self.commands.put(("set_part_opacity", part, opacity))
+    
+    def start_motion(self, group):
+        self.commands.put(("start_motion", group))
+    
+    def stop_all_motions(self):
+        self.commands.put(("stop_all_motions",))
+    
+    def setTransform(self, offset_x, offset_y, scale):
+        """同步主模型在场景中的位置和缩放（仅在变化时发送）"""
+        transform = (offset_x, offset_y, scale)
+        if transform != self.transform:
+            self.transform = transform
+            self.commands.put(("set_transform",) + transform)
+    
+    def isAlive(self):
+        return self.process.is_alive()
+    
+    def latestFrame(self):
+        """获取新完成的帧（无新帧时返回 None）"""
+        result = self.frames.read(self.last_counter, out=self.frame_back)
+        if result is None:
+            return None
+        self.last_counter, frame = result
+        self.frame_front, self.frame_back = frame, self.frame_front
+        return frame
+    
+    def stop(self):
+        """通知渲染进程退出并释放共享内存"""
+        if self.process.is_alive():
+            self.commands.put(("stop",))
+            self.process.join(timeout=2.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        self.commands.close()
+        self.frames.close()
+
+class ResourceTracker:
+    """资源生命周期与内存预算跟踪
+    
+    按模型、材质、帧缓冲、模型压缩包和界面面板分类统计内存（估算值），超出预算时按
+    最久未使用顺序释放可释放的资源，加载新模型前可用 reserve 检查预算；切换模型后检查
+    旧对象是否仍被引用并记录泄漏。
+    """
+    CATEGORIES = ("model", "texture", "frame", "bundle", "panel")
+    CATEGORY_NAMES = {
+        "model": "模型", "texture": "材质", "frame": "帧缓冲", "bundle": "压缩包", "panel": "界面"
+    }
+    WARNING_INTERVAL = 60.0
+    
+    def __init__(self, budget=0):
+        self.budget = budget
+        self.entries = {}
+        self.watched = []
+        self.last_warning = 0.0
+    
+    def track(self, key, category, size, release=None, owner=None):
+        """登记资源；提供 release 回调的资源可在超出预算时被释放"""
+        self.entries[key] = {
+            "category": category,
+            "size": int(size),
+            "release": release,
+            "owner": owner,
+            "last_used": time.monotonic(),
+        }
+    
+    def touch(self, key):
+        """标记资源最近被使用"""
+        entry = self.entries.get(key)
+        if entry:
+            entry["last_used"] = time.monotonic()
+    
+    def untrack(self, key):
+        self.entries.pop(key, None)
+    
+    def untrackOwner(self, owner):
+        """移除某个模型名下的全部资源"""
+        for key in [k for k, e in self.entries.items() if e["owner"] == owner or k == owner]:
+            del self.entries[key]
+    
+    def usage(self):
+        """按类别统计的字节数"""
+        totals = dict.fromkeys(self.CATEGORIES, 0)
+        for entry in self.entries.values():
+            totals[entry["category"]] = totals.get(entry["category"], 0) + entry["size"]
+        return totals
+    
+    def total(self):
+        return sum(entry["size"] for entry in self.entries.values())
+    
+    def ownedSize(self, owner):
+        """某个模型名下全部资源的字节数"""
+        return sum(e["size"] for k, e in self.entries.items() if e["owner"] == owner or k == owner)
+    
+    def evict(self, required=0):
+        """按最久未使用顺序释放资源，直到能再容纳 required 字节；返回 (被释放的键, 是否满足预算)"""
+        if not self.budget or self.total() + required <= self.budget:
+            return [], True
+        
+        evicted = []
+        candidates = sorted(
+            (item for item in self.entries.items() if item[1]["release"]),
+            key=lambda item: item[1]["last_used"]
+        )
+        for key, entry in candidates:
+            entry["release"]()
+            self.entries.pop(key, None)
+            evicted.append(key)
+            if self.total() + required <= self.budget:
+                return evicted, True
+        return evicted, False
+    
+    def enforceBudget(self):
+        """超出预算时释放可释放的资源，返回被释放的资源键（无法满足预算时限频记录警告）"""
+        evicted, fits = self.evict()
+        now = time.monotonic()
+        if not fits and now - self.last_warning >= self.WARNING_INTERVAL:
+            self.last_warning = now
+            logger.warning("内存占用 %.1f MB 超出预算 %.1f MB，且没有可释放的资源",
+                           self.total() / 2**20, self.budget / 2**20)
+        return evicted
+    
+    def reserve(self, size, freeing=0):
+        """为即将加载的 size 字节预留预算（freeing 为随后会释放的字节数），预算不足时返回 False"""
+        return self.evict(max(0, size - freeing))[1]
+    
+    def watch(self, obj, label):
+        """登记应被释放的对象，稍后由 checkLeaks 检查"""
+        try:
+            self.watched.append((weakref.ref(obj), label))
+        except TypeError:
+            pass
+    
+    def checkLeaks(self):
+        """检查已登记对象是否仍然存活，记录并返回泄漏对象的描述"""
+        gc.collect()
+        leaked = []
+        for ref, label in self.watched:
+            obj = ref()
+            if obj is None or (isinstance(obj, QObject) and sip.isdeleted(obj)):
+                continue
+            leaked.append(label)
+            logger.warning("可能的内存泄漏: %s 在切换模型后仍被引用 (%d 个引用者)",
+                           label, len(gc.get_referrers(obj)))
+        self.watched = []
+        return leaked
+    
+    def startTracing(self, frames=1):
+        """开启 tracemalloc 跟踪"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+    
+    def stopTracing(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+    
+    def snapshot(self, limit=10):
+        """获取 tracemalloc 快照中占用最多的分配位置"""
+        if not tracemalloc.is_tracing():
+            return []
+        stats = tracemalloc.take_snapshot().statistics('lineno')
+        return [str(stat) for stat in stats[:limit]]
+
 class Live2DRenderer(QWidget):
     """Live2D模型渲染组件 - 实现 QPainter 渲染"""
     updateModelSignal = pyqtSignal()
+    hitAreaClicked = pyqtSignal(object, str)
+    hitAreaHovered = pyqtSignal(str)
+    
+    # 按下与释放之间移动不超过该距离时视为点击
+    CLICK_DISTANCE = 4
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMinimumSize(800, 600)
         self.setAutoFillBackground(True)
+        # 悬停检测需要在未按键时也接收鼠标移动事件
+        self.setMouseTracking(True)
         
         # 初始化缓冲区
         self.buffer_width = 800
         self.buffer_height = 600
         self.image_data = np.zeros((self.buffer_height, self.buffer_width, 4), dtype=np.uint8)
         self.buffer_image = None
+        # 合成帧中有内容的区域，以及尚未重绘的旧内容区域
+        self.content_box = None
+        self.stale_rect = QRect()
+        # 引用场景帧缓冲内存的 QImage（同时持有数组，保证内存有效）
+        self.buffer_qimage = None
+        self.buffer_pixels = None
         self.updateModelSignal.connect(self.update)
         
         # 模型和控制参数
+        self.scene = Live2DScene()
+        self.primary_entry = None
+        self.active_entry = None
         self.current_model = None
         self.model_image = None
         self.drag_position = None
         self.drag_start = None
+        self.drag_entry = None
+        self.hovered_area = ""
         self.scale = 1.0
         self.translate_x = 0.0
         self.translate_y = 0.0
         
+        # 分层缓存：静态背景层、静态文字层以及模型位图
+        self.background_layer = None
+        self.overlay_layer = None
+        self.model_pixmap = None
+        self.worker_frame = None
+        self.resource_tracker = None
+        # 整个区域都由 paintEvent 覆盖绘制，Qt 无需预先擦除脏区域
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        
         # 默认背景色（浅灰色）
         pal = self.palette()
         pal.setColor(QPalette.Window, QColor(240, 240, 240))
         self.setPalette(pal)
     
     def setModel(self, model):
-        """设置当前Live2D模型"""
+        """设置当前Live2D模型（替换场景中的主模型，其他模型保持不变）"""
         self.current_model = model
         if model:
+            if self.primary_entry:
+                self.primary_entry.setModel(model)
+            else:
+                self.primary_entry = self.scene.addModel(model)
+            self.active_entry = self.primary_entry
             self.resetView()
             self.generateModelImage()
+        else:
+            if self.primary_entry:
+                self.scene.removeEntry(self.primary_entry)
+                self.primary_entry = None
+            self.active_entry = None
+            self.generateModelImage()
+        self.invalidateLayers()
+        self.update()
+    
+    def addSceneModel(self, model):
+        """向场景添加一个模型并置于最上层"""
+        entry = self.scene.addModel(model)
+        self.active_entry = entry
+        self.generateModelImage()
+        self.updateModelRegion()
+        return entry
+    
+    def removeSceneEntry(self, entry):
+        """从场景移除模型"""
+        self.scene.removeEntry(entry)
+        if entry is self.primary_entry:
+            self.primary_entry = None
+            self.current_model = None
+            self.invalidateLayers()
+        if entry is self.active_entry:
+            self.active_entry = self.primary_entry
+        self.generateModelImage()
         self.update()
     
+    def invalidateLayers(self):
+        """使静态背景层和文字层缓存失效（尺寸或模型变化时调用）"""
+        self.background_layer = None
+        self.overlay_layer = None
+    
+    def buildLayers(self):
+        """按当前窗口尺寸重建静态背景层和文字层"""
+        self.background_layer = QPixmap(self.size())
+        self.background_layer.fill(QColor(240, 240, 240))
+        
+        self.overlay_layer = QPixmap(self.size())
+        self.overlay_layer.fill(Qt.transparent)
+        if self.resource_tracker:
+            # 缓存层每帧都会用到，释放后立即重建，不作为可释放资源
+            self.resource_tracker.track(
+                "frame:layers", "frame", 2 * self.width() * self.height() * 4
+            )
+        if self.current_model:
+            painter = QPainter(self.overlay_layer)
+            painter.setPen(QColor(0, 0, 0))
+            info = f"模型: {os.path.basename(self.current_model.model_path)}"
+            painter.drawText(10, 20, info)
+            painter.end()
+    
+    def modelRect(self):
+        """计算合成帧中模型内容在窗口坐标系中的包围矩形"""
+        if not self.buffer_image or not self.content_box:
+            return QRect()
+        left, top, right, bottom = self.content_box
+        origin_x = self.width() / 2 + self.translate_x - self.buffer_width * self.scale / 2
+        origin_y = self.height() / 2 + self.translate_y - self.buffer_height * self.scale / 2
+        rect = QRectF(origin_x + left * self.scale, origin_y + top * self.scale,
+                      (right - left) * self.scale, (bottom - top) * self.scale)
+        # 向外取整并留出抗锯齿边距
+        return rect.toAlignedRect().adjusted(-2, -2, 2, 2)
+    
+    def infoRect(self):
+        """底部控制信息文字所占区域"""
+        metrics = self.fontMetrics()
+        return QRect(0, self.height() - 10 - metrics.ascent() - 2,
+                     self.width(), metrics.height() + 12)
+    
+    def updateTransform(self, old_rect):
+        """变换改变后仅重绘新旧模型区域的并集和控制信息区域"""
+        self.update(old_rect.united(self.modelRect()))
+        self.update(self.infoRect())
+    
+    def updateModelRegion(self):
+        """模型图像内容变化时仅重绘模型新旧所在区域"""
+        self.update(self.stale_rect.united(self.modelRect()))
+        self.stale_rect = QRect()
+    
+    def resizeEvent(self, event):
+        """窗口尺寸变化时重建缓存层"""
+        self.invalidateLayers()
+        super().resizeEvent(event)
+    
     def generateModelImage(self):
-        """生成模型的预览图像"""
-        if not self.current_model:
+        """将场景中的所有模型合成为预览图像"""
+        # 记录旧内容区域，模型移动或缩小后该区域也需要重绘
+        self.stale_rect = self.stale_rect.united(self.modelRect())
+        if not self.scene.entries:
+            self.model_image = None
+            self.buffer_image = None
+            self.model_pixmap = None
             return
-            
-        # 创建临时图像
-        img = Image.new('RGBA', (self.buffer_width, self.buffer_height), (240, 240, 240, 255))
-        
-        # 模型渲染占位符
-        model_img = Image.new('RGBA', (300, 400), (255, 150, 150, 200))
-        
-        # 将模型图像居中
-        x = (self.buffer_width - model_img.width) // 2
-        y = (self.buffer_height - model_img.height) // 2
-        img.paste(model_img, (x, y), model_img)
         
+        if self.worker_frame is not None:
+            # 主模型由渲染进程绘制，其余模型叠加在其输出的帧之上
+            self.setBufferImage(self.scene.compose(
+                self.buffer_width, self.buffer_height,
+                background=self.worker_frame, exclude=self.primary_entry
+            ))
+        else:
+            self.setBufferImage(self.scene.compose(self.buffer_width, self.buffer_height))
+    
+    def setWorkerFrame(self, frame):
+        """设置渲染进程输出的帧 (H, W, 4)，None 表示恢复界面进程渲染"""
+        if frame is None:
+            self.worker_frame = None
+            return
+        height, width = frame.shape[:2]
+        self.worker_frame = Image.frombuffer('RGBA', (width, height), frame, 'raw', 'RGBA', 0, 1)
+    
+    def setBufferImage(self, img):
+        """设置当前帧图像"""
         self.model_image = img
         self.buffer_image = img
+        self.content_box = self.scene.content_box
+        
+        # 持久的 QImage 直接引用场景的帧缓冲内存，帧缓冲重建时才重新创建
+        pixels = self.scene.frame_array
+        if self.buffer_qimage is None or self.buffer_pixels is not pixels:
+            self.buffer_pixels = pixels
+            self.buffer_qimage = QImage(
+                pixels.data,
+                img.width,
+                img.height,
+                img.width * 4,
+                QImage.Format_RGBA8888
+            )
+        qim = self.buffer_qimage
+        
+        # 仅在图像内容变化时转换一次位图，避免每次绘制都重新转换
+        if self.model_pixmap is None or self.model_pixmap.size() != qim.size():
+            self.model_pixmap = QPixmap.fromImage(qim)
+            if self.resource_tracker:
+                # 合成图像 + 位图
+                self.resource_tracker.track(
+                    "frame:buffer", "frame", 2 * img.width * img.height * 4
+                )
+        else:
+            self.model_pixmap.convertFromImage(qim)
+    
+    def hitTestEntry(self, entry, x, y):
+        """检测场景模型中被点中的区域名称"""
+        return entry.hit_areas.hitTest(entry.model, x, y)
+    
+    def mapToEntry(self, entry, x, y):
+        """将窗口坐标转换为场景模型图像坐标"""
+        stage_x = (x - self.width() / 2 - self.translate_x) / self.scale + self.buffer_width / 2
+        stage_y = (y - self.height() / 2 - self.translate_y) / self.scale + self.buffer_height / 2
+        left = (self.buffer_width - entry.image.width * entry.scale) / 2 + entry.offset_x
+        top = (self.buffer_height - entry.image.height * entry.scale) / 2 + entry.offset_y
+        return (stage_x - left) / entry.scale, (stage_y - top) / entry.scale
+    
+    def hitTest(self, x, y):
+        """从最上层模型开始检测点击区域，返回 (场景模型, 区域名称列表)"""
+        for entry in reversed(self.scene.sortedEntries()):
+            if entry.image is None or not entry.hit_areas.names:
+                continue
+            areas = self.hitTestEntry(entry, *self.mapToEntry(entry, x, y))
+            if areas:
+                return entry, areas
+        return None, []
+    
+    def updateHover(self, x, y):
+        """更新悬停的点击区域和鼠标指针"""
+        _, areas = self.hitTest(x, y)
+        area = areas[0] if areas else ""
+        if area != self.hovered_area:
+            self.hovered_area = area
+            self.setCursor(Qt.PointingHandCursor if area else Qt.ArrowCursor)
+            self.hitAreaHovered.emit(area)
     
     def resetView(self):
         """重置视图到中心位置和默认大小"""
@@ -83,64 +1550,82 @@ class Live2DRenderer(QWidget):
         self.translate_y = 0.0
     
     def paintEvent(self, event):
-        """绘制模型到窗口 - 使用 QPainter"""
-        super().paintEvent(event)
+        """绘制模型到窗口 - 使用 QPainter，仅重绘脏区域"""
+        if self.background_layer is None or self.background_layer.size() != self.size():
+            self.buildLayers()
+        elif self.resource_tracker:
+            self.resource_tracker.touch("frame:layers")
+        
+        dirty = event.rect()
         
         # 创建 QPainter 实例
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(dirty)
         
-        # 绘制背景
-        painter.fillRect(self.rect(), QColor(240, 240, 240))
+        # 绘制背景（缓存层）
+        painter.drawPixmap(dirty, self.background_layer, dirty)
         
-        if self.buffer_image:
-            # 转换PIL Image为QPixmap
-            qim = QImage(
-                self.buffer_image.tobytes(), 
-                self.buffer_image.width, 
-                self.buffer_image.height, 
-                QImage.Format_RGBA8888
-            )
-            pixmap = QPixmap.fromImage(qim)
-            
+        if self.model_pixmap and dirty.intersects(self.modelRect()):
             # 应用变换（缩放和平移）
             painter.save()
             painter.translate(self.width()/2 + self.translate_x, self.height()/2 + self.translate_y)
             painter.scale(self.scale, self.scale)
-            painter.drawPixmap(-self.buffer_width//2, -self.buffer_height//2, pixmap)
+            painter.drawPixmap(-self.buffer_width//2, -self.buffer_height//2, self.model_pixmap)
             painter.restore()
-            
-            # 显示调试信息
-            if self.current_model:
-                painter.setPen(QColor(0, 0, 0))
-                info = f"模型: {os.path.basename(self.current_model.model_path)}"
-                painter.drawText(10, 20, info)
+        
+        # 显示调试信息（缓存层）
+        painter.drawPixmap(dirty, self.overlay_layer, dirty)
         
         # 显示控制信息
-        info = f"缩放: {self.scale:.2f} | 位置: ({self.translate_x:.1f}, {self.translate_y:.1f})"
-        painter.setPen(QColor(0, 0, 0))
-        painter.drawText(10, self.height() - 10, info)
+        if dirty.intersects(self.infoRect()):
+            info = f"缩放: {self.scale:.2f} | 位置: ({self.translate_x:.1f}, {self.translate_y:.1f})"
+            painter.setPen(QColor(0, 0, 0))
+            painter.drawText(10, self.height() - 10, info)
+        painter.end()
     
     def mousePressEvent(self, event):
         """鼠标按下事件处理"""
         if event.button() == Qt.LeftButton:
             self.drag_start = (event.x(), event.y())
-            self.drag_position = (self.translate_x, self.translate_y)
+            if event.modifiers() & Qt.ShiftModifier and self.active_entry:
+                self.drag_entry = self.active_entry
+                self.drag_position = (self.drag_entry.offset_x, self.drag_entry.offset_y)
+            else:
+                self.drag_position = (self.translate_x, self.translate_y)
     
     def mouseMoveEvent(self, event):
-        """鼠标移动事件处理（拖拽模型）"""
+        """鼠标移动事件处理（拖拽模型，按住 Shift 时只移动场景中选中的模型）"""
+        if not event.buttons():
+            self.updateHover(event.x(), event.y())
+            return
+        
         if self.drag_start and event.buttons() & Qt.LeftButton:
             dx = event.x() - self.drag_start[0]
             dy = event.y() - self.drag_start[1]
+            if self.drag_entry:
+                self.drag_entry.offset_x = self.drag_position[0] + dx / self.scale
+                self.drag_entry.offset_y = self.drag_position[1] + dy / self.scale
+                self.generateModelImage()
+                self.updateModelRegion()
+                return
+            old_rect = self.modelRect()
             self.translate_x = self.drag_position[0] + dx
             self.translate_y = self.drag_position[1] + dy
-            self.update()
+            self.updateTransform(old_rect)
     
     def mouseReleaseEvent(self, event):
         """鼠标释放事件处理"""
         if event.button() == Qt.LeftButton:
+            if self.drag_start:
+                distance = abs(event.x() - self.drag_start[0]) + abs(event.y() - self.drag_start[1])
+                if distance <= self.CLICK_DISTANCE:
+                    entry, areas = self.hitTest(event.x(), event.y())
+                    if areas:
+                        self.hitAreaClicked.emit(entry, areas[0])
             self.drag_start = None
             self.drag_position = None
+            self.drag_entry = None
     
     def wheelEvent(self, event):
         """鼠标滚轮事件处理（缩放模型）"""
@@ -148,12 +1633,25 @@ class Live2DRenderer(QWidget):
         if event.angleDelta().y() < 0:
             factor = 0.9
         
+        if event.modifiers() & Qt.ShiftModifier and self.active_entry:
+            # 仅缩放场景中选中的模型
+            self.active_entry.scale = max(0.1, min(self.active_entry.scale * factor, 5.0))
+            self.generateModelImage()
+            self.updateModelRegion()
+            return
+        
+        old_rect = self.modelRect()
         self.scale *= factor
         self.scale = max(0.1, min(self.scale, 5.0))
-        self.update()
+        self.updateTransform(old_rect)
 
 class Live2DApp(QMainWindow):
     """Live2D GUI主应用 - 完整实现"""
+    # 内存预算默认不限制（0）；预算主要通过拒绝加载新模型来执行，需由用户按需开启
+    DEFAULT_MEMORY_BUDGET_MB = 0
+    # 每个参数控件组（分组框、滑块、标签）的估算内存
+    PANEL_WIDGET_BYTES = 16 * 1024
+    
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Live2D Editor Pro")
@@ -165,6 +1663,28 @@ class Live2DApp(QMainWindow):
         # 初始化模型
         self.current_model = None
         
+        # 表情与姿势混合引擎
+        self.expression_manager = ExpressionManager()
+        self.last_frame_time = None
+        self.frame_time = None
+        self.frame_dt = 0.0
+        
+        # 参数时间线录制与回放
+        self.recorder = None
+        self.recorder_fallback_warned = False
+        self.timeline = None
+        self.replay_start = None
+        self.replay_mapping = None
+        
+        # 场景列表中显示的模型（从上层到下层）
+        self.scene_entries = []
+        
+        # 独立渲染进程（可选）
+        self.render_client = None
+        
+        # 资源跟踪与内存预算
+        self.resource_tracker = ResourceTracker(budget=self.DEFAULT_MEMORY_BUDGET_MB * 2**20)
+        
         # 创建UI
         self.initUI()
         
@@ -176,6 +1696,12 @@ class Live2DApp(QMainWindow):
         self.update_timer.timeout.connect(self.updateModelState)
         self.update_timer.start(33)  # 约30FPS
         
+        # 资源统计定时器
+        self.render_widget.resource_tracker = self.resource_tracker
+        self.resource_timer = QTimer()
+        self.resource_timer.timeout.connect(self.updateResourceUsage)
+        self.resource_timer.start(1000)
+        
         # 状态栏消息
         self.status_bar.showMessage("就绪", 5000)
     
@@ -190,6 +1716,7 @@ class Live2DApp(QMainWindow):
         
         # 模型预览区域
         self.render_widget = Live2DRenderer()
+        self.render_widget.hitAreaClicked.connect(self.onHitAreaClicked)
         
         # 控制面板
         control_panel = QTabWidget()
@@ -241,6 +1768,16 @@ class Live2DApp(QMainWindow):
         
         file_menu.addSeparator()
         
+        self.record_action = file_menu.addAction("开始录制参数...")
+        self.record_action.setShortcut("Ctrl+R")
+        self.record_action.triggered.connect(self.toggleRecording)
+        
+        self.replay_action = file_menu.addAction("回放参数录制...")
+        self.replay_action.setShortcut("Ctrl+P")
+        self.replay_action.triggered.connect(self.toggleReplay)
+        
+        file_menu.addSeparator()
+        
         exit_action = file_menu.addAction("退出")
         exit_action.setShortcut("Ctrl+Q")
         exit_action.triggered.connect(self.close)
@@ -279,10 +1816,34 @@ class Live2DApp(QMainWindow):
         self.btn_load_model.clicked.connect(self.loadSelectedModel)
         model_layout.addWidget(self.btn_load_model)
         
+        self.btn_add_to_scene = QPushButton("添加到场景")
+        self.btn_add_to_scene.clicked.connect(self.addSelectedModelToScene)
+        model_layout.addWidget(self.btn_add_to_scene)
+        
         self.btn_model_folder = QPushButton("打开模型目录")
         self.btn_model_folder.clicked.connect(self.openModelFolder)
         model_layout.addWidget(self.btn_model_folder)
         
+        # 场景模型（按住 Shift 拖拽/滚轮可单独调整选中模型）
+        scene_group = QGroupBox("场景")
+        scene_layout = QVBoxLayout(scene_group)
+        
+        self.scene_list = QListWidget()
+        self.scene_list.currentRowChanged.connect(self.selectSceneEntry)
+        scene_layout.addWidget(self.scene_list)
+        
+        scene_buttons = QHBoxLayout()
+        
+        btn_bring_front = QPushButton("置于顶层")
+        btn_bring_front.clicked.connect(self.bringSceneEntryToFront)
+        scene_buttons.addWidget(btn_bring_front)
+        
+        btn_remove_scene = QPushButton("移出场景")
+        btn_remove_scene.clicked.connect(self.removeSelectedSceneEntry)
+        scene_buttons.addWidget(btn_remove_scene)
+        
+        scene_layout.addLayout(scene_buttons)
+        
         # 模型信息
         info_group = QGroupBox("模型信息")
         info_layout = QFormLayout(info_group)
@@ -326,10 +1887,35 @@ class Live2DApp(QMainWindow):
         
         motion_layout.addWidget(motion_stack)
         
+        # 表情控制
+        expression_group = QGroupBox("表情控制")
+        expression_layout = QVBoxLayout(expression_group)
+        
+        self.expression_combo = QComboBox()
+        expression_layout.addWidget(self.expression_combo)
+        
+        self.chk_stack_expression = QCheckBox("叠加表情")
+        self.chk_stack_expression.setChecked(False)
+        expression_layout.addWidget(self.chk_stack_expression)
+        
+        expression_buttons = QHBoxLayout()
+        
+        self.btn_apply_expression = QPushButton("应用表情")
+        self.btn_apply_expression.clicked.connect(self.applySelectedExpression)
+        expression_buttons.addWidget(self.btn_apply_expression)
+        
+        self.btn_clear_expression = QPushButton("清除表情")
+        self.btn_clear_expression.clicked.connect(self.clearExpressions)
+        expression_buttons.addWidget(self.btn_clear_expression)
+        
+        expression_layout.addLayout(expression_buttons)
+        
         # 添加到主布局
         layout.addWidget(model_group)
+        layout.addWidget(scene_group)
         layout.addWidget(info_group)
         layout.addWidget(motion_group)
+        layout.addWidget(expression_group)
         layout.addStretch()
         
         return tab
@@ -426,6 +2012,12 @@ class Live2DApp(QMainWindow):
         self.combo_fps.setCurrentIndex(0)
         perf_layout.addRow("帧率:", self.combo_fps)
         
+        self.chk_render_worker = QCheckBox("独立进程渲染")
+        self.chk_render_worker.setToolTip("在独立进程中更新和渲染主模型，界面繁忙时动画不卡顿")
+        self.chk_render_worker.setChecked(False)
+        self.chk_render_worker.toggled.connect(self.setRenderWorkerEnabled)
+        perf_layout.addRow(self.chk_render_worker)
+        
         # 模型目录设置
         path_group = QGroupBox("路径设置")
         path_layout = QVBoxLayout(path_group)
@@ -442,10 +2034,36 @@ class Live2DApp(QMainWindow):
         
         path_layout.addLayout(path_control)
         
+        # 内存管理
+        memory_group = QGroupBox("内存管理")
+        memory_layout = QFormLayout(memory_group)
+        
+        self.spin_memory_budget = QDoubleSpinBox()
+        self.spin_memory_budget.setRange(0, 65536)
+        self.spin_memory_budget.setDecimals(0)
+        self.spin_memory_budget.setSuffix(" MB")
+        self.spin_memory_budget.setSpecialValueText("不限制")
+        self.spin_memory_budget.setValue(self.DEFAULT_MEMORY_BUDGET_MB)
+        self.spin_memory_budget.valueChanged.connect(self.setMemoryBudget)
+        memory_layout.addRow("内存预算:", self.spin_memory_budget)
+        
+        self.lbl_memory_usage = QLabel("-")
+        self.lbl_memory_usage.setWordWrap(True)
+        memory_layout.addRow("占用:", self.lbl_memory_usage)
+        
+        self.chk_tracemalloc = QCheckBox("跟踪内存分配 (tracemalloc)")
+        self.chk_tracemalloc.toggled.connect(self.setMemoryTracing)
+        memory_layout.addRow(self.chk_tracemalloc)
+        
+        btn_memory_snapshot = QPushButton("内存快照")
+        btn_memory_snapshot.clicked.connect(self.showMemorySnapshot)
+        memory_layout.addRow(btn_memory_snapshot)
+        
         # 添加到主布局
         layout.addWidget(display_group)
         layout.addWidget(perf_group)
         layout.addWidget(path_group)
+        layout.addWidget(memory_group)
         layout.addStretch()
         
         return tab
@@ -512,6 +2130,15 @@ class Live2DApp(QMainWindow):
                 if any(f.endswith('.model3.json') for f in model_files):
                     self.model_list.addItem(item)
                     model_found = True
+            elif ModelBundle.isBundle(model_path):
+                # 模型压缩包：只读取中央目录，加载时才解压
+                try:
+                    is_model = ModelBundle.probe(model_path)
+                except (OSError, zipfile.BadZipFile, ValueError):
+                    continue
+                if is_model:
+                    self.model_list.addItem(item)
+                    model_found = True
         
         if not model_found:
             self.model_list.addItem("未找到模型，请添加模型到目录")
@@ -532,36 +2159,299 @@ class Live2DApp(QMainWindow):
     
     def loadModel(self, path):
         """加载Live2D模型"""
+        if not self.reserveModelMemory(path, replacing=self.current_model):
+            return
+        
         self.progress_bar.setVisible(True)
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         
+        # 参数列表会随模型变化，切换前结束录制与回放
+        self.stopRecording()
+        self.stopReplay()
+        self.status_bar.showMessage(f"加载模型: {os.path.basename(path)}...")
+        
+        # 先加载到局部变量，失败时当前模型保持不变
+        model = None
         try:
-            self.status_bar.showMessage(f"加载模型: {os.path.basename(path)}...")
-            
-            # 加载模型（实际实现）
-            self.current_model = Live2DModel.from_dir(path)
+            model = loadLive2DModel(path)
             self.progress_bar.setValue(50)
-            
-            # 更新UI
-            self.updateModelInfo()
-            self.updateMotionList()
-            self.updateParameters()
-            
-            # 设置渲染模型
-            self.render_widget.setModel(self.current_model)
-            
-            self.status_bar.showMessage(f"模型加载成功: {os.path.basename(path)}", 5000)
-            self.progress_bar.setValue(100)
-            
-            # 短暂显示进度条后隐藏
-            QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
-            
+            expression_manager = self.loadExpressions(model, path)
+        except Exception as e:
+            if model is not None:
+                model.destroy()
+            self.showLoadError(e)
+            return
+        
+        previous_model = self.current_model
+        previous_manager = self.expression_manager
+        try:
+            self.activateModel(model, expression_manager)
+            self.trackModel(model, path)
         except Exception as e:
-            error_msg = f"无法加载模型: {str(e)}"
-            self.status_bar.showMessage(error_msg, 8000)
-            QMessageBox.critical(self, "加载错误", error_msg)
-            self.progress_bar.setVisible(False)
+            # 回滚到原模型，销毁加载了一半的新模型
+            self.resource_tracker.untrackOwner(self.modelKey(model))
+            try:
+                self.activateModel(previous_model, previous_manager)
+            except Exception as restore_error:
+                logger.error("恢复原模型失败: %s", restore_error)
+            model.destroy()
+            self.showLoadError(e)
+            return
+        
+        # 释放被替换的模型并在稍后检查是否泄漏
+        if previous_model is not None and previous_model is not model:
+            self.releaseModel(previous_model)
+            QTimer.singleShot(2000, self.checkResourceLeaks)
+        
+        self.status_bar.showMessage(f"模型加载成功: {os.path.basename(path)}", 5000)
+        self.progress_bar.setValue(100)
+        
+        # 短暂显示进度条后隐藏
+        QTimer.singleShot(1000, lambda: self.progress_bar.setVisible(False))
+    
+    def activateModel(self, model, expression_manager):
+        """将模型设为当前模型并刷新界面、渲染和渲染进程"""
+        self.current_model = model
+        self.expression_manager = expression_manager
+        self.last_frame_time = None
+        
+        # 更新UI
+        self.updateModelInfo()
+        self.updateMotionList()
+        self.updateExpressionList()
+        self.updateParameters()
+        
+        # 设置渲染模型，表情在主模型每次更新之后写入
+        self.render_widget.setModel(model)
+        if self.render_widget.primary_entry:
+            self.render_widget.primary_entry.after_update = self.applyModelState
+        self.updateSceneList()
+        
+        if self.chk_render_worker.isChecked():
+            self.startRenderWorker()
+    
+    def showLoadError(self, error):
+        """显示模型加载错误"""
+        error_msg = f"无法加载模型: {str(error)}"
+        self.status_bar.showMessage(error_msg, 8000)
+        QMessageBox.critical(self, "加载错误", error_msg)
+        self.progress_bar.setVisible(False)
+    
+    def addSelectedModelToScene(self):
+        """将选中的模型作为额外角色添加到场景"""
+        if self.model_list.currentItem() is None:
+            return
+        
+        model_name = self.model_list.currentItem().text()
+        if model_name == "未找到模型，请添加模型到目录":
+            return
+        
+        if not self.current_model:
+            # 场景为空时作为主模型加载
+            self.loadModel(os.path.join(self.model_dir, model_name))
+            return
+        
+        if not self.reserveModelMemory(os.path.join(self.model_dir, model_name)):
+            return
+        
+        try:
+            model = loadLive2DModel(os.path.join(self.model_dir, model_name))
+        except Exception as e:
+            self.showLoadError(e)
+            return
+        
+        self.render_widget.addSceneModel(model)
+        self.trackModel(model, os.path.join(self.model_dir, model_name))
+        self.updateSceneList()
+        self.status_bar.showMessage(f"已添加到场景: {model_name}", 3000)
+    
+    def updateSceneList(self):
+        """按层级从上到下刷新场景模型列表"""
+        self.scene_entries = list(reversed(self.render_widget.scene.sortedEntries()))
+        self.scene_list.blockSignals(True)
+        self.scene_list.clear()
+        for entry in self.scene_entries:
+            suffix = " (主模型)" if entry is self.render_widget.primary_entry else ""
+            self.scene_list.addItem(f"{entry.name}{suffix}")
+        if self.render_widget.active_entry in self.scene_entries:
+            self.scene_list.setCurrentRow(self.scene_entries.index(self.render_widget.active_entry))
+        self.scene_list.blockSignals(False)
+    
+    def selectedSceneEntry(self):
+        """获取场景列表中选中的模型"""
+        row = self.scene_list.currentRow()
+        if 0 <= row < len(self.scene_entries):
+            return self.scene_entries[row]
+        return None
+    
+    def selectSceneEntry(self, row):
+        """选中场景模型，Shift 拖拽和滚轮将作用于该模型"""
+        self.render_widget.active_entry = self.selectedSceneEntry()
+    
+    def bringSceneEntryToFront(self):
+        """将选中模型置于顶层"""
+        entry = self.selectedSceneEntry()
+        if entry:
+            self.render_widget.scene.bringToFront(entry)
+            self.render_widget.generateModelImage()
+            self.render_widget.updateModelRegion()
+            self.updateSceneList()
+    
+    def removeSelectedSceneEntry(self):
+        """从场景移除选中模型"""
+        entry = self.selectedSceneEntry()
+        if not entry:
+            return
+        if entry is self.render_widget.primary_entry:
+            self.status_bar.showMessage("主模型不能移出场景，请加载其他模型替换", 3000)
+            return
+        self.render_widget.removeSceneEntry(entry)
+        self.releaseModel(entry.model)
+        self.updateSceneList()
+        QTimer.singleShot(2000, self.checkResourceLeaks)
+    
+    def modelKey(self, model):
+        """资源跟踪中模型的键"""
+        return f"model:{id(model)}"
+    
+    def estimateModel(self, path):
+        """估算模型及其材质的内存，无法估算时返回 (0, {})"""
+        try:
+            return estimateModelMemory(path)
+        except (OSError, ValueError) as e:
+            logger.warning("无法估算模型内存 %s: %s", path, e)
+            return 0, {}
+    
+    def reserveModelMemory(self, path, replacing=None):
+        """加载模型前检查内存预算，不足时提示并返回 False（replacing 为将被替换的模型）"""
+        moc_size, textures = self.estimateModel(path)
+        size = moc_size + sum(textures.values())
+        freeing = self.resource_tracker.ownedSize(self.modelKey(replacing)) if replacing else 0
+        if self.resource_tracker.reserve(size, freeing):
+            return True
+        message = (
+            f"加载 {os.path.basename(path)} 需要约 {size / 2**20:.1f} MB，"
+            f"将超出内存预算 {self.resource_tracker.budget / 2**20:.0f} MB"
+        )
+        self.status_bar.showMessage(message, 8000)
+        QMessageBox.warning(self, "内存预算不足", message + "\n请移除场景中的模型或提高内存预算。")
+        return False
+    
+    def trackModel(self, model, path):
+        """登记模型及其材质的估算内存"""
+        key = self.modelKey(model)
+        moc_size, textures = self.estimateModel(path)
+        self.resource_tracker.track(key, "model", moc_size, owner=key)
+        for texture, size in textures.items():
+            self.resource_tracker.track(f"texture:{id(model)}:{texture}", "texture", size, owner=key)
+    
+    def releaseModel(self, model):
+        """销毁模型、注销其资源并登记泄漏检查"""
+        name = os.path.basename(model.model_path)
+        model.destroy()
+        self.resource_tracker.untrackOwner(self.modelKey(model))
+        self.resource_tracker.watch(model, f"模型 {name}")
+    
+    def checkResourceLeaks(self):
+        """检查切换模型后旧模型和旧面板控件是否已释放"""
+        leaked = self.resource_tracker.checkLeaks()
+        if leaked:
+            self.status_bar.showMessage(f"检测到 {len(leaked)} 个未释放的对象，详见日志", 5000)
+    
+    def setMemoryBudget(self, value):
+        """设置内存预算（MB，0 表示不限制）"""
+        self.resource_tracker.budget = int(value * 2**20)
+        self.updateResourceUsage()
+    
+    def setMemoryTracing(self, enabled):
+        """开启或关闭 tracemalloc 跟踪"""
+        if enabled:
+            self.resource_tracker.startTracing()
+        else:
+            self.resource_tracker.stopTracing()
+    
+    def showMemorySnapshot(self):
+        """显示 tracemalloc 快照中占用最多的分配位置"""
+        if not self.chk_tracemalloc.isChecked():
+            QMessageBox.information(self, "内存快照", "请先启用内存分配跟踪")
+            return
+        lines = self.resource_tracker.snapshot(limit=15)
+        QMessageBox.information(self, "内存快照", "\n".join(lines) or "暂无数据")
+    
+    def trackBundles(self):
+        """同步打开的模型压缩包；模型从解压目录加载，压缩包可在超出预算时随时关闭"""
+        open_keys = set()
+        for bundle in ModelBundle.openBundles():
+            key = f"bundle:{bundle.path}"
+            open_keys.add(key)
+            entry = self.resource_tracker.entries.get(key)
+            if entry:
+                entry["size"] = bundle.mappedSize()
+            else:
+                self.resource_tracker.track(
+                    key, "bundle", bundle.mappedSize(),
+                    release=lambda path=bundle.path: ModelBundle.evict(path)
+                )
+        for key in [k for k in self.resource_tracker.entries if k.startswith("bundle:") and k not in open_keys]:
+            self.resource_tracker.untrack(key)
+    
+    def updateResourceUsage(self):
+        """执行内存预算并刷新占用显示（通过定时器调用）"""
+        self.trackBundles()
+        evicted = self.resource_tracker.enforceBudget()
+        if evicted:
+            logger.info("超出内存预算，已释放: %s", ", ".join(evicted))
+        
+        usage = self.resource_tracker.usage()
+        parts = [
+            f"{ResourceTracker.CATEGORY_NAMES[c]} {usage[c] / 2**20:.1f} MB"
+            for c in ResourceTracker.CATEGORIES
+        ]
+        total = f"合计 {self.resource_tracker.total() / 2**20:.1f} MB"
+        self.lbl_memory_usage.setText(" | ".join(parts) + f"\n{total}")
+    
+    def setRenderWorkerEnabled(self, enabled):
+        """切换独立进程渲染模式"""
+        if enabled:
+            self.startRenderWorker()
+        else:
+            self.stopRenderWorker()
+    
+    def startRenderWorker(self):
+        """为当前模型启动渲染进程"""
+        self.stopRenderWorker()
+        if not self.current_model:
+            return
+        
+        try:
+            self.render_client = RenderWorkerClient(
+                self.current_model.model_path,
+                self.render_widget.buffer_width,
+                self.render_widget.buffer_height
+            )
+        except Exception as e:
+            error_msg = f"无法启动渲染进程: {str(e)}"
+            self.status_bar.showMessage(error_msg, 5000)
+            self.chk_render_worker.setChecked(False)
+            return
+        
+        self.resource_tracker.track(
+            "frame:shared", "frame", self.render_client.frames.shm.size
+        )
+        self.status_bar.showMessage("已启用独立进程渲染", 3000)
+    
+    def stopRenderWorker(self):
+        """停止渲染进程"""
+        if self.render_client:
+            self.render_client.stop()
+            self.render_client = None
+            self.render_widget.setWorkerFrame(None)
+            self.resource_tracker.untrack("frame:shared")
+    
+    def activeModel(self):
+        """接收参数和动作命令的目标（渲染进程模式下为进程代理）"""
+        return self.render_client or self.current_model
     
     def reloadModel(self):
         """重新加载当前模型"""
@@ -616,6 +2506,38 @@ class Live2DApp(QMainWindow):
             self.btn_play_motion.setEnabled(False)
             self.btn_random_motion.setEnabled(False)
     
+    def loadExpressions(self, model, path):
+        """为模型创建表情管理器，从模型配置加载 exp3.json 表情和 pose3.json 姿势"""
+        manager = ExpressionManager()
+        manager.setModelIds(model.parameters or [], getattr(model, "parts", None) or [])
+        manager.loadFromSettings(readModelSettings(path), path)
+        return manager
+    
+    def updateExpressionList(self):
+        """更新表情列表"""
+        self.expression_combo.clear()
+        
+        names = self.expression_manager.expressionNames() if self.current_model else []
+        if names:
+            self.expression_combo.addItems(names)
+        else:
+            self.expression_combo.addItem("无可用表情")
+        self.btn_apply_expression.setEnabled(bool(names))
+        self.btn_clear_expression.setEnabled(bool(names))
+    
+    def applySelectedExpression(self):
+        """应用选中的表情（可叠加或交叉淡入淡出）"""
+        name = self.expression_combo.currentText()
+        if self.current_model and name in self.expression_manager.expressions:
+            self.expression_manager.setExpression(
+                name, stack=self.chk_stack_expression.isChecked()
+            )
+            self.status_bar.showMessage(f"应用表情: {name}", 3000)
+    
+    def clearExpressions(self):
+        """淡出所有表情"""
+        self.expression_manager.clearExpressions()
+    
     def updateParameters(self):
         """更新参数列表"""
         # 清除现有参数控件
@@ -624,6 +2546,8 @@ class Live2DApp(QMainWindow):
             widget = item.widget()
             if widget:
                 widget.deleteLater()
+                self.resource_tracker.watch(widget, f"参数面板控件 {widget.title()}")
+        self.resource_tracker.untrack("panel:parameters")
         
         if self.current_model:
             # 获取模型参数
@@ -662,6 +2586,9 @@ class Live2DApp(QMainWindow):
                 self.param_container_layout.addWidget(group)
             
             self.param_container_layout.addStretch()
+            self.resource_tracker.track(
+                "panel:parameters", "panel", len(params) * self.PANEL_WIDGET_BYTES
+            )
             self.status_bar.showMessage(f"加载了 {len(params)} 个参数", 3000)
         else:
             self.status_bar.showMessage("没有参数可以显示", 3000)
@@ -672,17 +2599,13 @@ class Live2DApp(QMainWindow):
             # 将百分比转换为0-1范围的值
             normalized = value / 100.0
             
-            # 实际更新模型参数
-            self.current_model.set_parameter(param, normalized)
+            # 记录为基础值，由每帧的表情混合结果统一写入模型
+            if not self.expression_manager.setBaseValue(param, normalized):
+                self.current_model.set_parameter(param, normalized)
     
     def resetParameters(self):
         """重置所有参数"""
         if self.current_model:
-            # 重置参数值
-            params = self.current_model.parameters or []
-            for param in params:
-                self.current_model.set_parameter(param, 0.5)
-            
             # 重置UI滑块
             for i in range(self.param_container_layout.count() - 1):  # 忽略最后的stretch
                 item = self.param_container_layout.itemAt(i)
@@ -692,6 +2615,9 @@ class Live2DApp(QMainWindow):
                         for child in widget.children():
                             if isinstance(child, QSlider):
                                 child.setValue(50)
+            
+            # 重置参数值并交还给动作驱动（滑块信号会重新标记覆盖，需在其后执行）
+            self.expression_manager.releaseBaseValues(0.5)
     
     def playSelectedMotion(self):
         """播放选中的动作"""
@@ -699,8 +2625,27 @@ class Live2DApp(QMainWindow):
         if self.current_model and motion != "未加载模型":
             self.status_bar.showMessage(f"播放动作: {motion}", 3000)
             # 实际播放动作逻辑
-            if self.current_model.motion_manager:
-                self.current_model.motion_manager.start_motion(motion)
+            self.startMotion(self.activeModel(), motion)
+    
+    def onHitAreaClicked(self, entry, area):
+        """点击模型区域时播放对应的动作分组（如 TapBody）"""
+        self.status_bar.showMessage(f"点击区域: {entry.name} - {area}", 3000)
+        
+        group = f"Tap{area}"
+        if group not in entry.motion_groups:
+            # 退而求其次：名称中包含区域名的动作分组
+            group = next((g for g in entry.motion_groups if area.lower() in g.lower()), None)
+        model = self.activeModel() if entry.model is self.current_model else entry.model
+        if group:
+            self.startMotion(model, group)
+    
+    def startMotion(self, model, motion):
+        """播放动作（回放录制时忽略，以保证回放结果确定）"""
+        if self.timeline and model is self.activeModel():
+            self.status_bar.showMessage("回放中不能播放动作", 3000)
+            return
+        if model.motion_manager:
+            model.motion_manager.start_motion(motion)
     
     def playRandomMotion(self):
         """播放随机动作"""
@@ -710,8 +2655,7 @@ class Live2DApp(QMainWindow):
             if motions:
                 motion = np.random.choice(motions)
                 self.status_bar.showMessage(f"播放随机动作: {motion}", 3000)
-                if self.current_model.motion_manager:
-                    self.current_model.motion_manager.start_motion(motion)
+                self.startMotion(self.activeModel(), motion)
     
     def exportImage(self):
         """导出当前模型为图片"""
@@ -739,6 +2683,93 @@ class Live2DApp(QMainWindow):
             else:
                 self.status_bar.showMessage("没有可导出的图像", 3000)
     
+    def toggleRecording(self):
+        """开始或停止录制参数时间线"""
+        if self.recorder:
+            self.stopRecording()
+            return
+        if not self.current_model:
+            self.status_bar.showMessage("请先加载模型", 3000)
+            return
+        
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "保存参数录制",
+            "recording.l2drec",
+            "参数录制 (*.l2drec)"
+        )
+        if file_path:
+            try:
+                self.recorder = ParameterRecorder(file_path, self.expression_manager.param_ids)
+            except OSError as e:
+                error_msg = f"无法创建录制文件: {str(e)}"
+                self.status_bar.showMessage(error_msg, 5000)
+                QMessageBox.critical(self, "录制错误", error_msg)
+                return
+            self.record_action.setText("停止录制参数")
+            self.status_bar.showMessage(f"正在录制参数: {file_path}")
+    
+    def recordFrame(self):
+        """录制模型更新后（包含动作和物理）的参数，模型不支持读取时退回混合后的参数"""
+        values = readModelParameters(self.current_model, self.expression_manager.param_ids)
+        if values is None or len(values) != len(self.expression_manager.param_ids):
+            if not self.recorder_fallback_warned:
+                logger.warning("模型不支持读取参数值，录制中不包含动作和物理驱动的参数")
+                self.recorder_fallback_warned = True
+            values = self.expression_manager.output_values
+        self.recorder.record(values)
+    
+    def stopRecording(self):
+        """停止录制并写入剩余帧"""
+        if self.recorder:
+            frames = self.recorder.frame_count
+            self.recorder.close()
+            self.recorder = None
+            self.record_action.setText("开始录制参数...")
+            self.status_bar.showMessage(f"录制完成，共 {frames} 帧", 5000)
+    
+    def toggleReplay(self):
+        """开始或停止回放参数时间线"""
+        if self.timeline:
+            self.stopReplay()
+            return
+        if not self.current_model:
+            self.status_bar.showMessage("请先加载模型", 3000)
+            return
+        
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "打开参数录制",
+            "",
+            "参数录制 (*.l2drec)"
+        )
+        if file_path:
+            try:
+                timeline = ParameterTimeline(file_path)
+            except (OSError, ValueError) as e:
+                error_msg = f"无法读取录制文件: {str(e)}"
+                self.status_bar.showMessage(error_msg, 5000)
+                QMessageBox.critical(self, "回放错误", error_msg)
+                return
+            if not len(timeline):
+                self.status_bar.showMessage("录制文件中没有帧", 3000)
+                return
+            
+            self.timeline = timeline
+            self.replay_mapping = timeline.mapTo(self.expression_manager.param_ids)
+            self.replay_start = time.perf_counter()
+            # 回放期间参数完全由录制数据决定，停止动作并禁止新的动作
+            stopModelMotions(self.activeModel())
+            self.replay_action.setText("停止回放")
+            self.status_bar.showMessage(f"正在回放: {os.path.basename(file_path)}")
+    
+    def stopReplay(self):
+        """停止回放"""
+        if self.timeline:
+            self.timeline.close()
+            self.timeline = None
+            self.replay_mapping = None
+            self.replay_action.setText("回放参数录制...")
+            self.status_bar.showMessage("回放结束", 3000)
+    
     def showPreferences(self):
         """显示首选项对话框"""
         QMessageBox.information(self, "首选项", "首选项功能正在开发中...")
@@ -812,21 +2843,84 @@ class Live2DApp(QMainWindow):
         except ImportError:
             return "未安装"
     
+    def applyModelState(self, model):
+        """在模型更新之后混合表情与姿势并写入模型（回放时直接写入录制的参数向量）"""
+        manager = self.expression_manager
+        if self.timeline:
+            target, columns = self.replay_mapping
+            manager.output_values[target] = self.timeline.sample(self.frame_time - self.replay_start)[columns]
+            manager.apply(model, indices=target)
+            return
+        
+        animated = None
+        if model is self.current_model:
+            animated = readModelParameters(model, manager.param_ids)
+            if animated is not None and len(animated) != len(manager.param_ids):
+                animated = None
+        manager.update(self.frame_dt, animated)
+        manager.apply(model)
+    
     def updateModelState(self):
         """更新模型状态（通过定时器调用）"""
         if self.render_widget and self.current_model:
-            # 更新模型状态
-            self.current_model.update()
+            now = time.perf_counter()
+            self.frame_dt = 0.0 if self.last_frame_time is None else now - self.last_frame_time
+            self.frame_time = self.last_frame_time = now
+            
+            if self.render_client:
+                # 模型位于渲染进程中，无法读取动画参数值，表情以滑块基础值混合
+                self.applyModelState(self.render_client)
+                if self.timeline and now - self.replay_start >= self.timeline.duration:
+                    self.stopReplay()
+
+                if self.recorder:
+                    # 模型位于渲染进程中，只能录制界面端混合后的参数
+                    self.recorder.record(self.expression_manager.output_values)
+
+                if not self.render_client.isAlive():
+                    self.status_bar.showMessage("渲染进程已退出，切换回界面线程渲染", 5000)
+                    self.chk_render_worker.setChecked(False)
+                    return
+                primary = self.render_widget.primary_entry
+                self.render_client.setTransform(primary.offset_x, primary.offset_y, primary.scale)
+                
+                # 主模型只读取渲染进程最新完成的帧，其余场景模型仍在界面进程中更新
+                extras = [e for e in self.render_widget.scene.entries if e is not primary]
+                if extras:
+                    self.render_widget.scene.update(extras)
+                frame = self.render_client.latestFrame()
+                if frame is not None:
+                    self.render_widget.setWorkerFrame(frame)
+                if frame is not None or extras:
+                    self.render_widget.generateModelImage()
+                    self.render_widget.updateModelRegion()
+                return
+            
+            # 并行更新场景中所有模型（包括当前模型），主模型更新后由 applyModelState 写入表情
+            self.render_widget.scene.update()
+            if self.timeline and now - self.replay_start >= self.timeline.duration:
+                self.stopReplay()
+            
+            if self.recorder:
+                self.recordFrame()
             
             # 重新生成模型图像（实际中应使用OpenGL渲染）
             self.render_widget.generateModelImage()
-            self.render_widget.update()
+            self.render_widget.updateModelRegion()
     
     def closeEvent(self, event):
         """关闭应用时的清理工作"""
+        self.update_timer.stop()
+        self.resource_timer.stop()
+        self.stopRenderWorker()
+        for entry in self.render_widget.scene.entries:
+            if entry.model is not self.current_model:
+                entry.model.destroy()
+        self.render_widget.scene.shutdown()
         if self.current_model:
             self.current_model.destroy()
-        self.update_timer.stop()
+        self.stopRecording()
+        self.stopReplay()
         event.accept()
 
 if __name__ == "__main__":